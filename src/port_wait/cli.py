@@ -3,26 +3,55 @@
 import sys
 import json
 import click
-from typing import List, Tuple
-from .waiter import PortWaiter
+from typing import List, Optional, Tuple
+from .waiter import PortWaiter, Target, parse_target
+
+
+def _dumps_stdlib(obj) -> bytes:
+    # ensure_ascii=False so the output matches orjson, which writes raw UTF-8.
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _dumps = _dumps_stdlib
+
+
+def _parse_targets(ctx: click.Context, param: click.Parameter, value: Tuple[str, ...]) -> Tuple[Target, ...]:
+    """Validate and classify targets before any waiting starts."""
+    parsed = []
+    for target in value:
+        try:
+            parsed.append(parse_target(target))
+        except ValueError as e:
+            raise click.BadParameter(f"{target!r}: {e}")
+    return tuple(parsed)
 
 
 @click.command()
-@click.argument("targets", nargs=-1, required=True)
+@click.argument("targets", nargs=-1, required=True, callback=_parse_targets)
 @click.option("--timeout", "-t", default=30.0, help="Maximum time to wait in seconds", type=float)
 @click.option("--interval", "-i", default=0.5, help="Initial retry interval in seconds", type=float)
+@click.option("--min-interval", default=0.01, help="Minimum retry interval in seconds", type=float)
 @click.option("--max-interval", default=5.0, help="Maximum retry interval in seconds", type=float)
 @click.option("--connection-timeout", default=2.0, help="Connection timeout in seconds", type=float)
 @click.option("--expected-status", default=200, help="Expected HTTP status code", type=int)
-@click.option("--method", default="GET", help="HTTP method (GET/POST/HEAD)", type=click.Choice(["GET", "POST", "HEAD"]))
+@click.option("--method", default=None, help="HTTP method (GET/POST/HEAD) [default: HEAD, falling back to GET]",
+              type=click.Choice(["GET", "POST", "HEAD"]))
 @click.option("--header", "-H", multiple=True, help="HTTP header (format: 'Key: Value')")
+@click.option("--parallel", default=32, help="Maximum number of targets probed at the same time",
+              type=click.IntRange(min=1))
 @click.option("--any", "any_mode", is_flag=True, help="Succeed if ANY target is ready (default: ALL)")
 @click.option("--verbose", "-v", is_flag=True, help="Show retry attempts and connection status")
 @click.option("--quiet", "-q", is_flag=True, help="Only output on failure")
 @click.option("--json", "json_output", is_flag=True, help="Output results as JSON")
-def main(targets: Tuple[str], timeout: float, interval: float, max_interval: float,
-         connection_timeout: float, expected_status: int, method: str, header: Tuple[str],
-         any_mode: bool, verbose: bool, quiet: bool, json_output: bool):
+def main(targets: Tuple[Target, ...], timeout: float, interval: float, min_interval: float, max_interval: float,
+         connection_timeout: float, expected_status: int, method: Optional[str], header: Tuple[str],
+         parallel: int, any_mode: bool, verbose: bool, quiet: bool, json_output: bool):
     """Wait for TCP ports or HTTP endpoints to become available.
     
     TARGETS can be:
@@ -43,6 +72,7 @@ def main(targets: Tuple[str], timeout: float, interval: float, max_interval: flo
     waiter = PortWaiter(
         timeout=timeout,
         initial_interval=interval,
+        min_interval=min_interval,
         max_interval=max_interval,
         connection_timeout=connection_timeout
     )
@@ -53,16 +83,18 @@ def main(targets: Tuple[str], timeout: float, interval: float, max_interval: flo
         "headers": headers if headers else None
     }
 
-    if len(targets) == 1:
-        result = waiter.wait_for_target(targets[0], verbose=verbose, **kwargs)
-        results = [result]
-    else:
-        target_list: List[Tuple[str, dict]] = [(t, kwargs) for t in targets]
-        results = waiter.wait_for_multiple(target_list, all_mode=not any_mode, verbose=verbose)
+    try:
+        if len(targets) == 1:
+            result = waiter.wait_for_target(targets[0], verbose=verbose, **kwargs)
+            results, succeeded = [result], int(result.success)
+        else:
+            target_list: List[Tuple[Target, dict]] = [(t, kwargs) for t in targets]
+            results, succeeded = waiter.wait_for_multiple_counted(
+                target_list, all_mode=not any_mode, verbose=verbose, max_parallel=parallel)
+    finally:
+        waiter.close()
 
-    all_success = all(r.success for r in results)
-    any_success = any(r.success for r in results)
-    success = any_success if any_mode else all_success
+    success = succeeded > 0 if any_mode else succeeded == len(results)
 
     if json_output:
         output = {
@@ -70,8 +102,11 @@ def main(targets: Tuple[str], timeout: float, interval: float, max_interval: flo
             "mode": "any" if any_mode else "all",
             "results": [r.to_dict() for r in results]
         }
-        print(json.dumps(output, indent=2))
+        sys.stdout.flush()
+        sys.stdout.buffer.write(_dumps(output) + b"\n")
+        sys.stdout.buffer.flush()
     elif not quiet or not success:
+        lines = []
         for result in results:
             status = "✓" if result.success else "✗"
             msg = f"{status} {result.target}"
@@ -79,7 +114,8 @@ def main(targets: Tuple[str], timeout: float, interval: float, max_interval: flo
                 msg += f" (attempts: {result.attempts}, elapsed: {result.elapsed:.1f}s)"
             if result.error:
                 msg += f" - {result.error}"
-            print(msg)
+            lines.append(msg)
+        sys.stdout.write("\n".join(lines) + "\n")
 
     sys.exit(0 if success else 1)
 
@@ -1,13 +1,142 @@
 """Core logic for TCP port and HTTP health checking with retry/backoff."""
 
+import asyncio
+import functools
+import selectors
+import queue
 import socket
+import threading
 import time
-import requests
-from typing import Optional, Dict, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import urllib3
+from enum import IntEnum
+from typing import Awaitable, Callable, Optional, Dict, List, NamedTuple, Tuple, TypeVar, Union
+
+_ADDRINFO_TTL = 60.0
+_addrinfo_cache: Dict[Tuple[str, int], Tuple[float, list]] = {}
+_addrinfo_lock = threading.Lock()
+
+
+def _lookup_addrinfo(host: str, port: int) -> Optional[list]:
+    """Return address info for a literal IP or a fresh cache entry, without resolving."""
+    try:
+        socket.inet_aton(host)
+    except OSError:
+        pass
+    else:
+        return [(socket.AF_INET, socket.SOCK_STREAM, 0, "", (host, port))]
+
+    with _addrinfo_lock:
+        entry = _addrinfo_cache.get((host, port))
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _getaddrinfo_cached(host: str, port: int, ttl: float = _ADDRINFO_TTL) -> list:
+    """Resolve ``host:port`` for IPv4 TCP, caching successful lookups for ``ttl`` seconds."""
+    result = _lookup_addrinfo(host, port)
+    if result is not None:
+        return result
+
+    # Failed lookups raise and are not cached: the name may appear at any moment.
+    result = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM)
+    with _addrinfo_lock:
+        _addrinfo_cache[(host, port)] = (time.monotonic() + ttl, result)
+    return result
+
+
+T = TypeVar("T")
+
+_HTTP_PREFIXES = ("http://", "https://")
+_INVALID_TARGET = "Invalid target format. Use host:port or http(s)://url"
+# Weight of the newest probe in the moving average of probe latency.
+_EMA_WEIGHT = 0.2
+# Statuses servers use to say they do not implement HEAD for a resource.
+_HEAD_UNSUPPORTED = (405, 501)
+
+
+class TargetKind(IntEnum):
+    TCP = 0
+    HTTP = 1
+
+
+def _classify(target: str) -> TargetKind:
+    return TargetKind.HTTP if target.startswith(_HTTP_PREFIXES) else TargetKind.TCP
+
+
+class Target(NamedTuple):
+    """A parsed wait target; ``host`` and ``port`` are only set for TCP targets."""
+    kind: TargetKind
+    raw: str
+    host: Optional[str] = None
+    port: Optional[int] = None
+
+
+def parse_target(target: str) -> Target:
+    """Classify ``target`` as TCP or HTTP once, raising ValueError if it is malformed."""
+    kind = _classify(target)
+    if kind == TargetKind.HTTP:
+        return Target(kind, target)
+
+    host, sep, digits = target.rpartition(":")
+    if not sep or not digits:
+        raise ValueError(_INVALID_TARGET)
+    port = 0
+    for char in digits:
+        digit = ord(char) - 48
+        if not 0 <= digit <= 9:
+            raise ValueError(_INVALID_TARGET)
+        port = port * 10 + digit
+        if port > 65535:
+            raise ValueError(_INVALID_TARGET)
+    return Target(kind, target, host, port)
+
+
+class _DaemonPool:
+    """Reusable daemon worker threads fed from a queue.
+
+    Workers are never joined, so a call stuck in a blocking connect cannot hold up
+    returning once ``--any`` is met. Idle workers pick up later calls, and a new worker
+    is started only when every existing one is busy.
+    """
+
+    def __init__(self):
+        self._jobs: "queue.SimpleQueue[Optional[Callable[[], None]]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+
+    def submit(self, job: Callable[[], None]) -> None:
+        with self._lock:
+            if self._idle:
+                self._idle -= 1
+            else:
+                thread = threading.Thread(target=self._work, name="port-wait-worker", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._jobs.put(job)
+
+    def shutdown(self) -> None:
+        """Ask every worker to exit once it finishes its current job."""
+        with self._lock:
+            for _ in self._threads:
+                self._jobs.put(None)
+            self._threads = []
+            self._idle = 0
+
+    def _work(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            job()
+            with self._lock:
+                self._idle += 1
 
 
 class WaitResult:
+    __slots__ = ("success", "target", "attempts", "elapsed", "error")
+
     def __init__(self, success: bool, target: str, attempts: int, elapsed: float, error: Optional[str] = None):
         self.success = success
         self.target = target
@@ -27,86 +156,317 @@ class WaitResult:
 
 class PortWaiter:
     def __init__(self, timeout: float = 30.0, initial_interval: float = 0.5,
-                 max_interval: float = 5.0, connection_timeout: float = 2.0):
+                 max_interval: float = 5.0, connection_timeout: float = 2.0,
+                 min_interval: float = 0.01):
         self.timeout = timeout
         self.initial_interval = initial_interval
         self.max_interval = max_interval
+        self.min_interval = min_interval
         self.connection_timeout = connection_timeout
+        # Shared pool so repeated polls reuse keep-alive connections. Failed attempts are
+        # never retried here (the wait loop does that), but redirects are still followed.
+        self._http = urllib3.PoolManager(
+            num_pools=16,
+            maxsize=16,
+            retries=urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=30),
+            timeout=urllib3.Timeout(connect=connection_timeout, read=connection_timeout)
+        )
+        # URLs that rejected HEAD; automatic probes go straight to GET for these.
+        self._get_only_urls = set()
+        # Per-thread selector reused by every TCP probe made from that thread. Every
+        # selector is also kept in _selectors so close() can release them all.
+        self._local = threading.local()
+        self._selectors: List[selectors.BaseSelector] = []
+        self._selectors_lock = threading.Lock()
+        # Workers for blocking calls made from the event loop; created on first use.
+        self._pool: Optional[_DaemonPool] = None
+
+    def close(self) -> None:
+        self._http.clear()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        with self._selectors_lock:
+            for sel in self._selectors:
+                sel.close()
+            self._selectors.clear()
+            # Drop the closed selectors from every thread, not just the caller's.
+            self._local = threading.local()
+
+    def _selector(self) -> selectors.BaseSelector:
+        sel = getattr(self._local, "selector", None)
+        if sel is None:
+            sel = selectors.DefaultSelector()
+            with self._selectors_lock:
+                self._selectors.append(sel)
+                self._local.selector = sel
+        return sel
 
-    def check_tcp_port(self, host: str, port: int) -> bool:
+    def _run_detached(self, func: Callable[[], T]) -> "asyncio.Future[T]":
+        """Run blocking ``func`` on the daemon pool and return a future for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def settle(result: Optional[T], error: Optional[BaseException]) -> None:
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        def job() -> None:
+            try:
+                result, error = func(), None
+            except Exception as e:
+                result, error = None, e
+            try:
+                loop.call_soon_threadsafe(settle, result, error)
+            except RuntimeError:
+                pass  # The loop already finished; nobody is waiting for this call anymore.
+
+        if self._pool is None:
+            self._pool = _DaemonPool()
+        self._pool.submit(job)
+        return future
+
+    def __enter__(self) -> "PortWaiter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def check_tcp_port(self, host: str, port: int, timeout: Optional[float] = None) -> bool:
+        if timeout is None:
+            timeout = self.connection_timeout
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.connection_timeout)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except (socket.gaierror, socket.timeout, OSError):
+            family, sock_type, proto, _, address = _getaddrinfo_cached(host, port)[0]
+            sock = socket.socket(family, sock_type, proto)
+        except (OSError, UnicodeError):
+            # UnicodeError: the host cannot be IDNA-encoded (e.g. a label over 63 chars).
+            return False
+
+        try:
+            sock.setblocking(False)
+            try:
+                sock.connect(address)
+                return True
+            except BlockingIOError:
+                # Connect in progress (EINPROGRESS, or WSAEWOULDBLOCK on Windows); wake up as
+                # soon as the kernel reports the outcome.
+                pass
+            sel = self._selector()
+            sel.register(sock, selectors.EVENT_WRITE)
+            try:
+                ready = sel.select(timeout)
+            finally:
+                sel.unregister(sock)
+            if not ready:
+                return False
+            return sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+        except OSError:
             return False
+        finally:
+            sock.close()
 
     def check_http_endpoint(self, url: str, expected_status: int = 200,
-                           method: str = "GET", headers: Optional[Dict[str, str]] = None) -> bool:
+                           method: Optional[str] = "GET", headers: Optional[Dict[str, str]] = None) -> bool:
+        """Check that ``url`` answers with ``expected_status``.
+
+        With ``method=None`` the probe uses HEAD, so no body is transferred, and falls back
+        to GET for servers that reject HEAD.
+        """
+        try:
+            if method is None:
+                if url not in self._get_only_urls:
+                    status = self._request_status("HEAD", url, headers)
+                    if status not in _HEAD_UNSUPPORTED:
+                        return status == expected_status
+                    self._get_only_urls.add(url)
+                method = "GET"
+            return self._request_status(method, url, headers) == expected_status
+        except (urllib3.exceptions.HTTPError, OSError):
+            return False
+
+    def _request_status(self, method: str, url: str, headers: Optional[Dict[str, str]]) -> int:
+        response = self._http.request(method, url, headers=headers or {}, preload_content=False)
+        response.drain_conn()
+        response.release_conn()
+        return response.status
+
+    def wait_for_target(self, target: Union[str, Target], verbose: bool = False, **kwargs) -> WaitResult:
+        if isinstance(target, str):
+            try:
+                target = parse_target(target)
+            except ValueError as e:
+                return WaitResult(False, target, 0, 0.0, str(e))
+
+        if target.kind == TargetKind.HTTP:
+            return self._wait_http(target.raw, verbose, **kwargs)
+        return self._wait_tcp(target.raw, target.host, target.port, verbose)
+
+    def _wait_tcp(self, name: str, host: str, port: int, verbose: bool = False) -> WaitResult:
+        def probe(remaining: float) -> bool:
+            return self.check_tcp_port(host, port, timeout=min(self.connection_timeout, remaining))
+        return self._retry(name, probe, verbose)
+
+    def _wait_http(self, url: str, verbose: bool = False, **kwargs) -> WaitResult:
+        expected_status = kwargs.get("expected_status", 200)
+        method = kwargs.get("method", "GET")
+        headers = kwargs.get("headers")
+
+        def probe(remaining: float) -> bool:
+            return self.check_http_endpoint(url, expected_status=expected_status,
+                                            method=method, headers=headers)
+        return self._retry(url, probe, verbose)
+
+    def _next_delay(self, latency: float, probe_start: float, start_time: float) -> Tuple[float, float]:
+        """Fold the last probe into the latency average and derive the next retry delay.
+
+        Polling every two probe-latencies keeps fast local refusals cheap to retry often,
+        while slow remote probes back off. The delay stays between ``min_interval`` and
+        ``max_interval`` and never overshoots the overall timeout.
+        """
+        now = time.time()
+        latency = (1 - _EMA_WEIGHT) * latency + _EMA_WEIGHT * (now - probe_start)
+        delay = min(max(2 * latency, self.min_interval), self.max_interval)
+        return latency, max(0.0, min(delay, self.timeout - (now - start_time)))
+
+    def _retry(self, name: str, probe: Callable[[float], bool], verbose: bool) -> WaitResult:
+        """Call ``probe`` with the remaining budget until it succeeds or the timeout expires."""
+        start_time = time.time()
+        attempts = 0
+        # Seeded so the first retry waits roughly the configured initial interval.
+        latency = self.initial_interval / 2
+
+        while time.time() - start_time < self.timeout:
+            attempts += 1
+            probe_start = time.time()
+
+            if probe(self.timeout - (probe_start - start_time)):
+                return WaitResult(True, name, attempts, time.time() - start_time)
+
+            latency, delay = self._next_delay(latency, probe_start, start_time)
+            if verbose:
+                print(f"Attempt {attempts}: {name} not ready, retrying in {delay:.2f}s...")
+
+            time.sleep(delay)
+
+        return WaitResult(False, name, attempts, time.time() - start_time,
+                        f"Timeout after {self.timeout}s")
+
+    async def _await_tcp(self, host: str, port: int, timeout: Optional[float] = None) -> bool:
+        if timeout is None:
+            timeout = self.connection_timeout
         try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers or {},
-                timeout=self.connection_timeout,
-                allow_redirects=True
+            # Only hop to a worker thread when a real DNS lookup is needed.
+            infos = _lookup_addrinfo(host, port)
+            if infos is None:
+                infos = await self._run_detached(functools.partial(_getaddrinfo_cached, host, port))
+            family, _, _, _, address = infos[0]
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(address[0], address[1], family=family),
+                timeout
             )
-            return response.status_code == expected_status
-        except (requests.RequestException, Exception):
+        except (asyncio.TimeoutError, OSError, UnicodeError):
             return False
+        writer.close()
+        return True
+
+    async def _await_http(self, url: str, expected_status: int = 200,
+                          method: Optional[str] = "GET", headers: Optional[Dict[str, str]] = None) -> bool:
+        # urllib3 is blocking, so HTTP probes run off the loop with the shared pool.
+        check = functools.partial(self.check_http_endpoint, url, expected_status=expected_status,
+                                  method=method, headers=headers)
+        return await self._run_detached(check)
+
+    async def _await_target(self, target: Union[str, Target], limit: asyncio.Semaphore,
+                            verbose: bool = False, **kwargs) -> WaitResult:
+        if isinstance(target, str):
+            try:
+                target = parse_target(target)
+            except ValueError as e:
+                return WaitResult(False, target, 0, 0.0, str(e))
+
+        if target.kind == TargetKind.HTTP:
+            expected_status = kwargs.get("expected_status", 200)
+            method = kwargs.get("method", "GET")
+            headers = kwargs.get("headers")
+
+            def probe(remaining: float) -> Awaitable[bool]:
+                return self._await_http(target.raw, expected_status=expected_status,
+                                        method=method, headers=headers)
+        else:
+            host, port = target.host, target.port
 
-    def wait_for_target(self, target: str, verbose: bool = False, **kwargs) -> WaitResult:
+            def probe(remaining: float) -> Awaitable[bool]:
+                return self._await_tcp(host, port, timeout=min(self.connection_timeout, remaining))
+
+        return await self._retry_async(target.raw, probe, limit, verbose)
+
+    async def _retry_async(self, name: str, probe: Callable[[float], Awaitable[bool]],
+                           limit: asyncio.Semaphore, verbose: bool) -> WaitResult:
         start_time = time.time()
         attempts = 0
-        interval = self.initial_interval
+        # Seeded so the first retry waits roughly the configured initial interval.
+        latency = self.initial_interval / 2
 
         while time.time() - start_time < self.timeout:
             attempts += 1
-            
-            if target.startswith("http://") or target.startswith("https://"):
-                success = self.check_http_endpoint(
-                    target,
-                    expected_status=kwargs.get("expected_status", 200),
-                    method=kwargs.get("method", "GET"),
-                    headers=kwargs.get("headers")
-                )
-            else:
-                try:
-                    host, port = target.rsplit(":", 1)
-                    success = self.check_tcp_port(host, int(port))
-                except ValueError:
-                    return WaitResult(False, target, attempts, time.time() - start_time,
-                                    "Invalid target format. Use host:port or http(s)://url")
+
+            async with limit:
+                probe_start = time.time()
+                success = await probe(self.timeout - (probe_start - start_time))
 
             if success:
-                return WaitResult(True, target, attempts, time.time() - start_time)
+                return WaitResult(True, name, attempts, time.time() - start_time)
 
+            latency, delay = self._next_delay(latency, probe_start, start_time)
             if verbose:
-                print(f"Attempt {attempts}: {target} not ready, retrying in {interval:.1f}s...")
+                print(f"Attempt {attempts}: {name} not ready, retrying in {delay:.2f}s...")
 
-            time.sleep(interval)
-            interval = min(interval * 2, self.max_interval)
+            await asyncio.sleep(delay)
 
-        return WaitResult(False, target, attempts, time.time() - start_time,
+        return WaitResult(False, name, attempts, time.time() - start_time,
                         f"Timeout after {self.timeout}s")
 
-    def wait_for_multiple(self, targets: List[Tuple[str, dict]], all_mode: bool = True,
-                         verbose: bool = False) -> List[WaitResult]:
-        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
-            futures = {
-                executor.submit(self.wait_for_target, target, verbose, **kwargs): target
-                for target, kwargs in targets
-            }
-            
-            results = []
-            for future in as_completed(futures):
-                result = future.result()
-                results.append(result)
-                
-                if not all_mode and result.success:
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    return results
-            
-            return results
\ No newline at end of file
+    async def _wait_all(self, targets: List[Tuple[Union[str, Target], dict]], all_mode: bool,
+                        verbose: bool, max_parallel: int) -> Tuple[List[WaitResult], int]:
+        # Caps probes in flight at once; targets beyond the cap queue for a slot.
+        limit = asyncio.Semaphore(max_parallel)
+        pending = {
+            asyncio.ensure_future(self._await_target(target, limit, verbose, **kwargs))
+            for target, kwargs in targets
+        }
+        results = []
+        succeeded = 0
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    results.append(result)
+                    succeeded += result.success
+
+                    if not all_mode and result.success:
+                        return results, succeeded
+        finally:
+            for task in pending:
+                task.cancel()
+        return results, succeeded
+
+    def wait_for_multiple(self, targets: List[Tuple[Union[str, Target], dict]], all_mode: bool = True,
+                         verbose: bool = False, max_parallel: int = 32) -> List[WaitResult]:
+        return self.wait_for_multiple_counted(targets, all_mode, verbose, max_parallel)[0]
+
+    def wait_for_multiple_counted(self, targets: List[Tuple[Union[str, Target], dict]],
+                                  all_mode: bool = True, verbose: bool = False,
+                                  max_parallel: int = 32) -> Tuple[List[WaitResult], int]:
+        """Like ``wait_for_multiple``, but also returns how many targets succeeded.
+
+        The count is tallied as targets finish, so callers deciding all/any success
+        need not scan the results again.
+        """
+        if max_parallel < 1:
+            raise ValueError(f"max_parallel must be at least 1, got {max_parallel}")
+        return asyncio.run(self._wait_all(targets, all_mode, verbose, max_parallel))
@@ -4,6 +4,7 @@ import pytest
 import json
 from click.testing import CliRunner
 from unittest.mock import patch, Mock
+from port_wait import cli as cli_module
 from port_wait.cli import main
 from port_wait.waiter import WaitResult
 
@@ -36,30 +37,61 @@ class TestCLI:
     @patch('port_wait.cli.PortWaiter')
     def test_multiple_targets_all_mode(self, mock_waiter_class):
         mock_waiter = Mock()
-        mock_waiter.wait_for_multiple.return_value = [
+        mock_waiter.wait_for_multiple_counted.return_value = ([
             WaitResult(True, "localhost:5432", 1, 0.5),
             WaitResult(True, "localhost:6379", 1, 0.5)
-        ]
+        ], 2)
         mock_waiter_class.return_value = mock_waiter
         
         result = self.runner.invoke(main, ['localhost:5432', 'localhost:6379'])
         
         assert result.exit_code == 0
-        mock_waiter.wait_for_multiple.assert_called_once()
+        mock_waiter.wait_for_multiple_counted.assert_called_once()
+        assert mock_waiter.wait_for_multiple_counted.call_args[1]['max_parallel'] == 32
+
+    @patch('port_wait.cli.PortWaiter')
+    def test_parallel_option(self, mock_waiter_class):
+        mock_waiter = Mock()
+        mock_waiter.wait_for_multiple_counted.return_value = ([
+            WaitResult(True, "localhost:5432", 1, 0.5),
+            WaitResult(True, "localhost:6379", 1, 0.5)
+        ], 2)
+        mock_waiter_class.return_value = mock_waiter
+        
+        result = self.runner.invoke(main, ['localhost:5432', 'localhost:6379', '--parallel', '4'])
+        
+        assert result.exit_code == 0
+        assert mock_waiter.wait_for_multiple_counted.call_args[1]['max_parallel'] == 4
 
     @patch('port_wait.cli.PortWaiter')
     def test_multiple_targets_any_mode(self, mock_waiter_class):
         mock_waiter = Mock()
-        mock_waiter.wait_for_multiple.return_value = [
+        mock_waiter.wait_for_multiple_counted.return_value = ([
             WaitResult(True, "localhost:5432", 1, 0.5),
             WaitResult(False, "localhost:9999", 5, 30.0, "Timeout")
-        ]
+        ], 1)
         mock_waiter_class.return_value = mock_waiter
         
         result = self.runner.invoke(main, ['localhost:5432', 'localhost:9999', '--any'])
         
         assert result.exit_code == 0
 
+    @patch('port_wait.cli.PortWaiter')
+    def test_status_lines(self, mock_waiter_class):
+        mock_waiter = Mock()
+        mock_waiter.wait_for_multiple_counted.return_value = ([
+            WaitResult(True, "localhost:5432", 1, 0.5),
+            WaitResult(False, "localhost:9999", 5, 30.0, "Timeout")
+        ], 1)
+        mock_waiter_class.return_value = mock_waiter
+        
+        result = self.runner.invoke(main, ['localhost:5432', 'localhost:9999'])
+        
+        assert result.output == (
+            "✓ localhost:5432\n"
+            "✗ localhost:9999 (attempts: 5, elapsed: 30.0s) - Timeout\n"
+        )
+
     @patch('port_wait.cli.PortWaiter')
     def test_json_output(self, mock_waiter_class):
         mock_waiter = Mock()
@@ -73,6 +105,25 @@ class TestCLI:
         assert output["success"] is True
         assert "results" in output
 
+    @patch('port_wait.cli._dumps', cli_module._dumps_stdlib)
+    @patch('port_wait.cli.PortWaiter')
+    def test_json_output_stdlib_fallback(self, mock_waiter_class):
+        mock_waiter = Mock()
+        mock_waiter.wait_for_target.return_value = WaitResult(True, "http://bücher.invalid/", 1, 0.5)
+        mock_waiter_class.return_value = mock_waiter
+        
+        result = self.runner.invoke(main, ['http://bücher.invalid/', '--json'])
+        
+        assert result.exit_code == 0
+        assert "bücher" in result.output
+        output = json.loads(result.output)
+        assert output["results"][0]["target"] == "http://bücher.invalid/"
+
+    def test_json_encoders_agree(self):
+        orjson = pytest.importorskip("orjson")
+        output = {"success": True, "results": [WaitResult(True, "http://bücher.invalid/", 1, 0.5).to_dict()]}
+        assert cli_module._dumps_stdlib(output) == orjson.dumps(output, option=orjson.OPT_INDENT_2)
+
     @patch('port_wait.cli.PortWaiter')
     def test_custom_timeout(self, mock_waiter_class):
         mock_waiter = Mock()
@@ -86,6 +137,17 @@ class TestCLI:
         call_kwargs = mock_waiter_class.call_args[1]
         assert call_kwargs['timeout'] == 60.0
 
+    @patch('port_wait.cli.PortWaiter')
+    def test_min_interval(self, mock_waiter_class):
+        mock_waiter = Mock()
+        mock_waiter.wait_for_target.return_value = WaitResult(True, "localhost:5432", 1, 0.5)
+        mock_waiter_class.return_value = mock_waiter
+        
+        result = self.runner.invoke(main, ['localhost:5432', '--min-interval', '1'])
+        
+        assert result.exit_code == 0
+        assert mock_waiter_class.call_args[1]['min_interval'] == 1.0
+
     @patch('port_wait.cli.PortWaiter')
     def test_http_endpoint_with_status(self, mock_waiter_class):
         mock_waiter = Mock()
@@ -110,6 +172,18 @@ class TestCLI:
         call_args = mock_waiter.wait_for_target.call_args
         assert call_args[1]['method'] == 'POST'
 
+    @patch('port_wait.cli.PortWaiter')
+    def test_http_default_method_is_automatic(self, mock_waiter_class):
+        mock_waiter = Mock()
+        mock_waiter.wait_for_target.return_value = WaitResult(True, "http://api:8080/health", 1, 0.5)
+        mock_waiter_class.return_value = mock_waiter
+        
+        result = self.runner.invoke(main, ['http://api:8080/health'])
+        
+        assert result.exit_code == 0
+        call_args = mock_waiter.wait_for_target.call_args
+        assert call_args[1]['method'] is None
+
     @patch('port_wait.cli.PortWaiter')
     def test_http_custom_headers(self, mock_waiter_class):
         mock_waiter = Mock()
@@ -132,6 +206,14 @@ class TestCLI:
         result = self.runner.invoke(main, [])
         assert result.exit_code != 0
 
+    @patch('port_wait.cli.PortWaiter')
+    def test_invalid_target_rejected_before_waiting(self, mock_waiter_class):
+        result = self.runner.invoke(main, ['localhost:5432', 'invalid-target'])
+        
+        assert result.exit_code == 2
+        assert "Invalid target format" in result.output
+        mock_waiter_class.assert_not_called()
+
     @patch('port_wait.cli.PortWaiter')
     def test_verbose_mode(self, mock_waiter_class):
         mock_waiter = Mock()
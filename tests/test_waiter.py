@@ -1,10 +1,15 @@
 """Tests for core waiter functionality."""
 
 import pytest
+import asyncio
+import selectors
 import socket
+import threading
 import time
+import urllib3
 from unittest.mock import patch, Mock, MagicMock
-from port_wait.waiter import PortWaiter, WaitResult
+from port_wait import waiter as waiter_module
+from port_wait.waiter import PortWaiter, WaitResult, Target, parse_target, TargetKind
 
 
 class TestWaitResult:
@@ -23,6 +28,25 @@ class TestWaitResult:
         assert data["success"] is False
         assert data["error"] == "Connection refused"
 
+    def test_has_no_instance_dict(self):
+        result = WaitResult(True, "localhost:5432", 1, 0.5)
+        assert not hasattr(result, "__dict__")
+
+
+class TestParseTarget:
+    def test_tcp_target(self):
+        assert parse_target("db:5432") == Target(TargetKind.TCP, "db:5432", "db", 5432)
+
+    def test_http_target(self):
+        target = parse_target("https://api/health")
+        assert target.kind == TargetKind.HTTP
+        assert target.raw == "https://api/health"
+
+    @pytest.mark.parametrize("target", ["db:port", "db", "db:", "db:+5", "db: 5", "db:70000"])
+    def test_invalid_target(self, target):
+        with pytest.raises(ValueError, match="Invalid target format"):
+            parse_target(target)
+
 
 class TestPortWaiter:
     def test_init_defaults(self):
@@ -31,6 +55,7 @@ class TestPortWaiter:
         assert waiter.initial_interval == 0.5
         assert waiter.max_interval == 5.0
         assert waiter.connection_timeout == 2.0
+        assert waiter.min_interval == 0.01
 
     def test_init_custom_values(self):
         waiter = PortWaiter(timeout=60.0, initial_interval=1.0, max_interval=10.0, connection_timeout=5.0)
@@ -39,23 +64,30 @@ class TestPortWaiter:
         assert waiter.max_interval == 10.0
         assert waiter.connection_timeout == 5.0
 
+    def test_context_manager_clears_pool(self):
+        waiter = PortWaiter()
+        with patch.object(waiter._http, 'clear') as mock_close:
+            with waiter:
+                pass
+        mock_close.assert_called_once()
+
     @patch('socket.socket')
     def test_check_tcp_port_success(self, mock_socket):
         mock_sock = Mock()
-        mock_sock.connect_ex.return_value = 0
+        mock_sock.connect.return_value = None
         mock_socket.return_value = mock_sock
         
         waiter = PortWaiter()
-        result = waiter.check_tcp_port("localhost", 5432)
+        result = waiter.check_tcp_port("127.0.0.1", 5432)
         
         assert result is True
-        mock_sock.connect_ex.assert_called_once_with(("localhost", 5432))
+        mock_sock.connect.assert_called_once_with(("127.0.0.1", 5432))
         mock_sock.close.assert_called_once()
 
     @patch('socket.socket')
     def test_check_tcp_port_failure(self, mock_socket):
         mock_sock = Mock()
-        mock_sock.connect_ex.return_value = 1
+        mock_sock.connect.side_effect = ConnectionRefusedError()
         mock_socket.return_value = mock_sock
         
         waiter = PortWaiter()
@@ -63,6 +95,55 @@ class TestPortWaiter:
         
         assert result is False
 
+    def test_check_tcp_port_listening(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        
+        try:
+            waiter = PortWaiter(connection_timeout=1.0)
+            assert waiter.check_tcp_port("127.0.0.1", listener.getsockname()[1]) is True
+        finally:
+            listener.close()
+
+    def test_check_tcp_port_reuses_selector(self):
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        port = closed.getsockname()[1]
+        
+        try:
+            waiter = PortWaiter(connection_timeout=1.0)
+            with patch('selectors.DefaultSelector', wraps=selectors.DefaultSelector) as mock_selector:
+                assert waiter.check_tcp_port("127.0.0.1", port) is False
+                assert waiter.check_tcp_port("127.0.0.1", port) is False
+            mock_selector.assert_called_once()
+            waiter.close()
+        finally:
+            closed.close()
+
+    def test_close_releases_selectors_from_all_threads(self):
+        waiter = PortWaiter()
+        made = []
+        worker = threading.Thread(target=lambda: made.append(waiter._selector()))
+        worker.start()
+        worker.join()
+        made.append(waiter._selector())
+        
+        waiter.close()
+        
+        assert made[0] is not made[1]
+        # A closed selector no longer has a key map.
+        assert all(sel.get_map() is None for sel in made)
+        assert waiter._selector() not in made
+        waiter.close()
+
+    def test_unencodable_host_is_not_ready(self):
+        host = "a" * 64 + ".com"
+        waiter = PortWaiter(connection_timeout=0.5)
+        
+        assert waiter.check_tcp_port(host, 80) is False
+        assert asyncio.run(waiter._await_tcp(host, 80)) is False
+
     @patch('socket.socket')
     def test_check_tcp_port_exception(self, mock_socket):
         mock_socket.side_effect = socket.gaierror("Name resolution failed")
@@ -72,10 +153,28 @@ class TestPortWaiter:
         
         assert result is False
 
-    @patch('requests.request')
+    @patch('socket.getaddrinfo')
+    def test_getaddrinfo_cached(self, mock_getaddrinfo):
+        waiter_module._addrinfo_cache.clear()
+        mock_getaddrinfo.return_value = [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.5", 5432))]
+        
+        first = waiter_module._getaddrinfo_cached("db", 5432)
+        second = waiter_module._getaddrinfo_cached("db", 5432)
+        
+        assert first == second
+        mock_getaddrinfo.assert_called_once()
+
+    @patch('socket.getaddrinfo')
+    def test_getaddrinfo_cached_skips_literal_ip(self, mock_getaddrinfo):
+        result = waiter_module._getaddrinfo_cached("127.0.0.1", 5432)
+        
+        assert result[0][4] == ("127.0.0.1", 5432)
+        mock_getaddrinfo.assert_not_called()
+
+    @patch('urllib3.PoolManager.request')
     def test_check_http_endpoint_success(self, mock_request):
         mock_response = Mock()
-        mock_response.status_code = 200
+        mock_response.status = 200
         mock_request.return_value = mock_response
         
         waiter = PortWaiter()
@@ -83,11 +182,23 @@ class TestPortWaiter:
         
         assert result is True
         mock_request.assert_called_once()
+        assert mock_request.call_args.args[0] == "GET"
+
+    @patch('urllib3.PoolManager.request')
+    def test_check_http_endpoint_head_falls_back_to_get(self, mock_request):
+        mock_request.side_effect = [Mock(status=405), Mock(status=200), Mock(status=200)]
+        
+        waiter = PortWaiter()
+        assert waiter.check_http_endpoint("http://localhost:8080/health", method=None) is True
+        assert waiter.check_http_endpoint("http://localhost:8080/health", method=None) is True
+        
+        methods = [call.args[0] for call in mock_request.call_args_list]
+        assert methods == ["HEAD", "GET", "GET"]
 
-    @patch('requests.request')
+    @patch('urllib3.PoolManager.request')
     def test_check_http_endpoint_wrong_status(self, mock_request):
         mock_response = Mock()
-        mock_response.status_code = 500
+        mock_response.status = 500
         mock_request.return_value = mock_response
         
         waiter = PortWaiter()
@@ -95,10 +206,10 @@ class TestPortWaiter:
         
         assert result is False
 
-    @patch('requests.request')
+    @patch('urllib3.PoolManager.request')
     def test_check_http_endpoint_custom_status(self, mock_request):
         mock_response = Mock()
-        mock_response.status_code = 201
+        mock_response.status = 201
         mock_request.return_value = mock_response
         
         waiter = PortWaiter()
@@ -106,15 +217,23 @@ class TestPortWaiter:
         
         assert result is True
 
-    @patch('requests.request')
+    @patch('urllib3.PoolManager.request')
     def test_check_http_endpoint_exception(self, mock_request):
-        mock_request.side_effect = Exception("Connection error")
+        mock_request.side_effect = urllib3.exceptions.ProtocolError("Connection aborted")
         
         waiter = PortWaiter()
         result = waiter.check_http_endpoint("http://localhost:8080/health")
         
         assert result is False
 
+    @patch('urllib3.PoolManager.request')
+    def test_check_http_endpoint_unexpected_error_propagates(self, mock_request):
+        mock_request.side_effect = RuntimeError("bug")
+        
+        waiter = PortWaiter()
+        with pytest.raises(RuntimeError):
+            waiter.check_http_endpoint("http://localhost:8080/health")
+
     @patch.object(PortWaiter, 'check_tcp_port')
     def test_wait_for_target_tcp_success(self, mock_check):
         mock_check.return_value = True
@@ -138,6 +257,40 @@ class TestPortWaiter:
         assert result.attempts > 1
         assert "Timeout" in result.error
 
+    def test_next_delay_bounded_by_intervals(self):
+        waiter = PortWaiter(timeout=60.0, min_interval=0.05, max_interval=5.0)
+        now = time.time()
+        
+        _, fast = waiter._next_delay(0.0, now, now)
+        _, slow = waiter._next_delay(2.0, now - 2.0, now - 2.0)
+        _, capped = waiter._next_delay(10.0, now - 10.0, now - 10.0)
+        
+        assert fast == 0.05
+        assert 0.05 < slow < 5.0
+        assert capped == 5.0
+
+    @patch.object(PortWaiter, 'check_tcp_port')
+    def test_wait_for_target_polls_faster_after_quick_refusals(self, mock_check):
+        mock_check.return_value = False
+        
+        waiter = PortWaiter(timeout=1.0, initial_interval=0.5)
+        result = waiter.wait_for_target("localhost:9999")
+        
+        # Doubling from 0.5s would only fit two attempts into the budget.
+        assert result.attempts >= 4
+        assert result.elapsed < 1.2
+
+    @patch('urllib3.PoolManager.request')
+    def test_wait_for_target_http_defaults_to_get(self, mock_request):
+        mock_request.return_value = Mock(status=200)
+        
+        waiter = PortWaiter(timeout=5.0)
+        assert waiter.wait_for_target("http://localhost:8080/health").success is True
+        assert waiter.wait_for_target("http://localhost:8080/health", method=None).success is True
+        
+        methods = [call.args[0] for call in mock_request.call_args_list]
+        assert methods == ["GET", "HEAD"]
+
     @patch.object(PortWaiter, 'check_http_endpoint')
     def test_wait_for_target_http_success(self, mock_check):
         mock_check.return_value = True
@@ -155,30 +308,137 @@ class TestPortWaiter:
         assert result.success is False
         assert "Invalid target format" in result.error
 
-    @patch.object(PortWaiter, 'wait_for_target')
-    def test_wait_for_multiple_all_mode_success(self, mock_wait):
-        mock_wait.side_effect = [
-            WaitResult(True, "localhost:5432", 1, 0.5),
-            WaitResult(True, "localhost:6379", 1, 0.5)
-        ]
+    @patch.object(PortWaiter, '_await_tcp')
+    def test_wait_for_multiple_all_mode_success(self, mock_tcp):
+        mock_tcp.return_value = True
         
         waiter = PortWaiter()
         targets = [("localhost:5432", {}), ("localhost:6379", {})]
         results = waiter.wait_for_multiple(targets, all_mode=True)
         
+        assert isinstance(results, list)
         assert len(results) == 2
         assert all(r.success for r in results)
 
-    @patch.object(PortWaiter, 'wait_for_target')
-    def test_wait_for_multiple_any_mode_partial_success(self, mock_wait):
-        mock_wait.side_effect = [
-            WaitResult(True, "localhost:5432", 1, 0.5),
-            WaitResult(False, "localhost:9999", 5, 30.0, "Timeout")
-        ]
+    @patch.object(PortWaiter, '_await_tcp')
+    def test_wait_for_multiple_counted(self, mock_tcp):
+        mock_tcp.side_effect = lambda host, port, timeout=None: port == 5432
+        
+        waiter = PortWaiter(timeout=0.3, initial_interval=0.1)
+        targets = [("localhost:5432", {}), ("localhost:9999", {})]
+        results, succeeded = waiter.wait_for_multiple_counted(targets, all_mode=True)
+        
+        assert len(results) == 2
+        assert succeeded == 1
+
+    @patch.object(PortWaiter, '_await_tcp')
+    def test_wait_for_multiple_all_mode_timeout(self, mock_tcp):
+        mock_tcp.side_effect = lambda host, port, timeout=None: port == 5432
+        
+        waiter = PortWaiter(timeout=0.5, initial_interval=0.1)
+        targets = [("localhost:5432", {}), ("localhost:9999", {})]
+        results = waiter.wait_for_multiple(targets, all_mode=True)
+        
+        assert len(results) == 2
+        assert results[0].success is True
+        assert results[1].success is False
+        assert "Timeout" in results[1].error
+
+    @patch.object(PortWaiter, '_await_tcp')
+    def test_wait_for_multiple_any_mode_partial_success(self, mock_tcp):
+        mock_tcp.side_effect = lambda host, port, timeout=None: port == 5432
         
         waiter = PortWaiter()
         targets = [("localhost:5432", {}), ("localhost:9999", {})]
         results = waiter.wait_for_multiple(targets, all_mode=False)
         
-        assert len(results) == 2
+        assert len(results) == 1
         assert any(r.success for r in results)
+
+    def test_wait_for_multiple_caps_parallel_probes(self):
+        in_flight = []
+        peak = []
+
+        async def probe(host, port, timeout=None):
+            in_flight.append(port)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(port)
+            return True
+
+        waiter = PortWaiter()
+        targets = [(f"localhost:{port}", {}) for port in range(5000, 5006)]
+        with patch.object(PortWaiter, '_await_tcp', side_effect=probe):
+            results = waiter.wait_for_multiple(targets, all_mode=True, max_parallel=2)
+        
+        assert len(results) == 6
+        assert max(peak) == 2
+
+    @pytest.mark.parametrize("max_parallel", [0, -1])
+    def test_wait_for_multiple_rejects_invalid_parallel(self, max_parallel):
+        waiter = PortWaiter(timeout=1.0)
+        targets = [("localhost:5432", {}), ("localhost:6379", {})]
+        with pytest.raises(ValueError, match="max_parallel"):
+            waiter.wait_for_multiple(targets, max_parallel=max_parallel)
+
+    @patch.object(PortWaiter, 'check_http_endpoint')
+    @patch.object(PortWaiter, '_await_tcp')
+    def test_wait_for_multiple_any_mode_does_not_wait_for_blocked_probes(self, mock_tcp, mock_http):
+        mock_tcp.return_value = True
+        mock_http.side_effect = lambda *args, **kwargs: time.sleep(2.0)
+        
+        waiter = PortWaiter()
+        targets = [("http://localhost:8080/health", {}), ("localhost:5432", {})]
+        start = time.time()
+        results = waiter.wait_for_multiple(targets, all_mode=False)
+        
+        assert time.time() - start < 1.0
+        assert [r.target for r in results] == ["localhost:5432"]
+
+    @patch.object(PortWaiter, 'check_http_endpoint')
+    def test_wait_for_multiple_reuses_probe_threads(self, mock_http):
+        mock_http.return_value = False
+        
+        waiter = PortWaiter(timeout=0.5, initial_interval=0.01)
+        targets = [("http://localhost:8080/health", {}), ("http://localhost:8081/health", {})]
+        results = waiter.wait_for_multiple(targets, all_mode=True)
+        
+        assert mock_http.call_count > 10
+        assert all(r.attempts > 5 for r in results)
+        workers = waiter._pool._threads
+        assert len(workers) <= 2
+        
+        waiter.close()
+        for thread in workers:
+            thread.join(timeout=1.0)
+        assert not any(thread.is_alive() for thread in workers)
+
+    @patch.object(PortWaiter, 'check_http_endpoint')
+    @patch.object(PortWaiter, '_await_tcp')
+    def test_wait_for_multiple_mixed_targets(self, mock_tcp, mock_http):
+        mock_tcp.return_value = True
+        mock_http.return_value = True
+        
+        waiter = PortWaiter()
+        targets = [("localhost:5432", {}), ("http://localhost:8080/health", {"expected_status": 204})]
+        results = waiter.wait_for_multiple(targets, all_mode=True)
+        
+        assert all(r.success for r in results)
+        assert mock_http.call_args[1]['expected_status'] == 204
+
+    def test_await_tcp(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        open_port = listener.getsockname()[1]
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(("127.0.0.1", 0))
+        closed_port = closed.getsockname()[1]
+        
+        try:
+            waiter = PortWaiter(connection_timeout=1.0)
+            assert asyncio.run(waiter._await_tcp("127.0.0.1", open_port)) is True
+            assert asyncio.run(waiter._await_tcp("127.0.0.1", closed_port)) is False
+        finally:
+            listener.close()
+            closed.close()